@@ -1,44 +1,77 @@
 """
 Excel to JSON Converter - Vercel Serverless Function
 """
-import json
 import io
 import os
 import re
 import hashlib
+import functools
+import posixpath
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from typing import Any, NamedTuple, Optional, Tuple
+from itertools import chain, islice, repeat
 from http.server import BaseHTTPRequestHandler
-import cgi
 
+import orjson
 import pandas as pd
+from streaming_form_data import StreamingFormDataParser
+from streaming_form_data.targets import ValueTarget
 from openpyxl import load_workbook
+from openpyxl.utils.cell import coordinate_to_tuple, get_column_letter, range_boundaries
+from openpyxl.xml.constants import SHEET_MAIN_NS
+from openpyxl.xml.functions import iterparse
 
 # ---------------- Helpers ----------------
 
-CELL_REF_RE = re.compile(r"\$?[A-Z]{1,3}\$?\d+")
+# Excel caps sheets at 16384 columns (XFD); index 0 is unused so col numbers map directly
+_COL_LETTERS = [None] + [get_column_letter(i) for i in range(1, 16385)]
+
+# Ranges are tried first so their endpoints are not also reported as single cells
+REF_RE = re.compile(r"(?P<range>\$?[A-Z]{1,3}\$?\d+:\$?[A-Z]{1,3}\$?\d+)|(?P<cell>\$?[A-Z]{1,3}\$?\d+)")
 RANGE_RE = re.compile(r"(\$?[A-Z]{1,3}\$?\d+):(\$?[A-Z]{1,3}\$?\d+)")
 
 
 def _hash_id(*parts):
-    h = hashlib.sha1("::".join(str(p) for p in parts).encode()).hexdigest()[:4]
+    # Only 16 bits are kept, so ask blake2b for exactly that instead of truncating SHA-1
+    h = hashlib.blake2b(b"::".join(str(p).encode() for p in parts), digest_size=2).hexdigest()
     return h
 
 
-def _iter_non_empty(ws):
-    for row in ws.iter_rows():
-        for c in row:
-            if c.value not in (None, ""):
-                yield c
-
-
-def _cell_type(v):
-    if isinstance(v, (int, float)) and not isinstance(v, bool):
-        return "number"
+class CellRec(NamedTuple):
+    """Compact per-cell record, expanded to the JSON cell object only when serialized."""
+    v: Any
+    t: str
+    display: str
+    f: Optional[str] = None
+    deps: Tuple[str, ...] = ()
+    hyperlink: Optional[str] = None
+    comment: Optional[str] = None
+    annotated: bool = False
+
+    def to_json(self):
+        item = {"v": self.v, "t": self.t, "display": self.display}
+        if self.f:
+            item["f"] = self.f
+            item["deps"] = self.deps
+        if self.annotated:
+            item["hyperlink"] = self.hyperlink
+            item["comment"] = self.comment
+        return item
+
+
+def _cell_fields(v):
+    # (value, type, display) for a non-empty cell, from a single type check chain
     if isinstance(v, bool):
-        return "bool"
+        return v, "bool", str(v)
+    if isinstance(v, (int, float)):
+        return v, "number", str(v)
     if isinstance(v, (datetime, pd.Timestamp)):
-        return "datetime"
-    return "str"
+        return v.isoformat(), "datetime", str(v)
+    return v, "str", str(v)
 
 
 def _safe_val(v):
@@ -47,91 +80,71 @@ def _safe_val(v):
     return v
 
 
-def _tuple_to_coord(rc):
-    from openpyxl.utils.cell import get_column_letter
-    r, c = rc
-    return f"{get_column_letter(c)}{r}"
-
-
 def _expand_range(rg):
-    from openpyxl.utils.cell import coordinate_to_tuple, get_column_letter
     m = RANGE_RE.match(rg)
     if not m:
-        return []
+        return
     a, b = m.group(1), m.group(2)
     r1, c1 = coordinate_to_tuple(a)
     r2, c2 = coordinate_to_tuple(b)
-    cells = []
     for r in range(min(r1, r2), max(r1, r2) + 1):
         for c in range(min(c1, c2), max(c1, c2) + 1):
-            cells.append(f"{get_column_letter(c)}{r}")
-    return cells
+            yield f"{_COL_LETTERS[c]}{r}"
 
 
+@functools.lru_cache(maxsize=65536)
 def _formula_deps(formula):
-    if not formula or not isinstance(formula, str) or not formula.startswith("="):
-        return []
-    refs = set()
-    for m in CELL_REF_RE.finditer(formula):
-        refs.add(m.group(0))
-    for m in RANGE_RE.finditer(formula):
-        refs.add(f"{m.group(1)}:{m.group(2)}")
-    return sorted(refs)
-
-
-def _detect_text_sections(ws):
-    rows = {}
-    for c in _iter_non_empty(ws):
-        if isinstance(c.value, str) and c.value.strip():
-            rows.setdefault(c.row, []).append(c)
+    # Cached results are shared between cells, so they are returned as tuples
+    if type(formula) is not str or not formula.startswith("="):
+        return ()
+    refs = {m.group(0) for m in REF_RE.finditer(formula)}
+    return tuple(sorted(refs))
+
+
+def _tap_text_map(rows, row_map, text_cols):
+    # Passes value rows through while recording what section detection needs,
+    # so cell extraction and sections share one read of the sheet
+    for r, row in enumerate(rows, 1):
+        for col, v in enumerate(row, 1):
+            if v is None or v == "":
+                continue
+            display = str(v)
+            if not display.strip():
+                continue
+            row_map.setdefault(r, {})[col] = display
+            if isinstance(v, str):
+                lo, hi = text_cols.get(r, (col, col))
+                text_cols[r] = (min(lo, col), max(hi, col))
+        yield row
+
 
+def _detect_text_sections(row_map, text_cols):
     sections = []
-    if not rows:
+    if not text_cols:
         return sections
 
     current_block_rows = []
-    for r in range(1, ws.max_row + 1):
-        if r in rows:
+    # One trailing row past the last text row flushes the final block
+    for r in range(1, max(text_cols) + 2):
+        if r in text_cols:
             current_block_rows.append(r)
-        else:
-            if current_block_rows:
-                rmin, rmax = min(current_block_rows), max(current_block_rows)
-                cmin = min(min(c.column for c in rows[rr]) for rr in current_block_rows)
-                cmax = max(max(c.column for c in rows[rr]) for rr in current_block_rows)
-                text_lines = []
-                for rr in range(rmin, rmax + 1):
-                    line = []
-                    for cc in range(cmin, cmax + 1):
-                        addr = _tuple_to_coord((rr, cc))
-                        val = ws[addr].value
-                        if val is not None and str(val).strip():
-                            line.append(str(val))
-                    if line:
-                        text_lines.append(" ".join(line))
-                if text_lines:
-                    from openpyxl.utils.cell import get_column_letter
-                    rng = f"{get_column_letter(cmin)}{rmin}:{get_column_letter(cmax)}{rmax}"
-                    sections.append({"range": rng, "text": "\n".join(text_lines)})
-                current_block_rows = []
-
-    if current_block_rows:
-        rmin, rmax = min(current_block_rows), max(current_block_rows)
-        cmin = min(min(c.column for c in rows[rr]) for rr in current_block_rows)
-        cmax = max(max(c.column for c in rows[rr]) for rr in current_block_rows)
-        text_lines = []
+            continue
+        if not current_block_rows:
+            continue
+        rmin, rmax = current_block_rows[0], current_block_rows[-1]
+        cmin = min(text_cols[rr][0] for rr in current_block_rows)
+        cmax = max(text_cols[rr][1] for rr in current_block_rows)
+        buf = io.StringIO()
         for rr in range(rmin, rmax + 1):
-            line = []
-            for cc in range(cmin, cmax + 1):
-                addr = _tuple_to_coord((rr, cc))
-                val = ws[addr].value
-                if val is not None and str(val).strip():
-                    line.append(str(val))
+            line = " ".join(v for cc, v in row_map[rr].items() if cmin <= cc <= cmax)
             if line:
-                text_lines.append(" ".join(line))
-        if text_lines:
-            from openpyxl.utils.cell import get_column_letter
-            rng = f"{get_column_letter(cmin)}{rmin}:{get_column_letter(cmax)}{rmax}"
-            sections.append({"range": rng, "text": "\n".join(text_lines)})
+                if buf.tell():
+                    buf.write("\n")
+                buf.write(line)
+        if buf.tell():
+            rng = f"{_COL_LETTERS[cmin]}{rmin}:{_COL_LETTERS[cmax]}{rmax}"
+            sections.append({"range": rng, "text": buf.getvalue()})
+        current_block_rows = []
 
     return sections
 
@@ -150,7 +163,7 @@ def _sheet_chunks(sheet_name, ws, excel_tables, sections, max_cells=400):
             "sheet": sheet_name,
             "range": t["range"],
             "text": text,
-            "cells": _expand_range(t["range"])[:max_cells]
+            "cells": list(islice(_expand_range(t["range"]), max_cells))
         })
 
     for s in sections:
@@ -160,20 +173,250 @@ def _sheet_chunks(sheet_name, ws, excel_tables, sections, max_cells=400):
             "sheet": sheet_name,
             "range": s["range"],
             "text": s["text"],
-            "cells": _expand_range(s["range"])[:max_cells]
+            "cells": list(islice(_expand_range(s["range"]), max_cells))
         })
 
     return chunks
 
 
-def _open_workbooks(file_bytes):
+def _open_workbooks(file_bytes, needs_formulas=True):
     b1 = io.BytesIO(file_bytes)
-    wb_values = load_workbook(b1, data_only=True)
+    wb_values = load_workbook(b1, data_only=True, read_only=True, keep_links=False)
+    if not needs_formulas:
+        return wb_values, None
     b2 = io.BytesIO(file_bytes)
-    wb_formulas = load_workbook(b2, data_only=False)
+    wb_formulas = load_workbook(b2, data_only=False, read_only=True, keep_links=False)
     return wb_values, wb_formulas
 
 
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _rel_id(el):
+    for key, value in el.attrib.items():
+        if _local(key) == "id":
+            return value
+    return None
+
+
+def _part_rels(zf, part, external=False):
+    """Map relationship ids of an archive part to (relationship type, target path).
+
+    External targets (hyperlink URLs) are kept verbatim when ``external`` is set.
+    """
+    folder, name = posixpath.split(part)
+    rels = {}
+    try:
+        src = zf.open(posixpath.join(folder, "_rels", name + ".rels"))
+    except KeyError:
+        return rels
+    with src:
+        for _, el in iterparse(src):
+            if _local(el.tag) != "Relationship":
+                continue
+            target = el.get("Target", "")
+            if el.get("TargetMode") == "External":
+                if not external:
+                    continue
+                path = target
+            elif target.startswith("/"):
+                path = target[1:]
+            else:
+                path = posixpath.normpath(posixpath.join(folder, target))
+            rels[el.get("Id")] = (el.get("Type", "").rsplit("/", 1)[-1], path)
+    return rels
+
+
+def _scan_table(zf, path):
+    tbl = {}
+    headers = []
+    with zf.open(path) as src:
+        for _, el in iterparse(src):
+            tag = _local(el.tag)
+            if tag == "tableColumn":
+                headers.append(el.get("name") or "")
+            elif tag == "table":
+                tbl = {"name": el.get("displayName") or el.get("name"), "range": el.get("ref")}
+    tbl["headers"] = headers
+    tbl["records"] = []
+    return tbl
+
+
+def _scan_comments(zf, path):
+    comments = {}
+    with zf.open(path) as src:
+        for _, el in iterparse(src):
+            if _local(el.tag) != "comment":
+                continue
+            snippets = []
+            for text in el:
+                if _local(text.tag) != "text":
+                    continue
+                # Plain text first, then the runs of rich text, as openpyxl joins them
+                for child in text:
+                    tag = _local(child.tag)
+                    if tag == "t":
+                        snippets.append(child.text or "")
+                    elif tag == "r":
+                        snippets.extend(t.text or "" for t in child if _local(t.tag) == "t")
+            comments[el.get("ref")] = "".join(snippets)
+            el.clear()
+    return comments
+
+
+def _scan_notes(zf, rels, links, merged):
+    """Map coordinates to (hyperlink, comment) from <hyperlink> entries and the comments part."""
+    notes = {}
+    bounds = [range_boundaries(ref) for ref in merged] if links else []
+    for ref, rid in links:
+        target = rels[rid][1] if rid in rels else None
+        if ":" in ref:
+            coords = list(_expand_range(ref))
+        else:
+            row, col = coordinate_to_tuple(ref)
+            # A link on a merged cell belongs to the range's top-left cell
+            for m_col, m_row, x_col, x_row in bounds:
+                if m_row <= row <= x_row and m_col <= col <= x_col:
+                    row, col = m_row, m_col
+                    break
+            coords = [f"{_COL_LETTERS[col]}{row}"]
+        for coord in coords:
+            notes[coord] = (target, None)
+    for kind, part in rels.values():
+        if kind != "comments":
+            continue
+        try:
+            comments = _scan_comments(zf, part)
+        except KeyError:
+            continue
+        for coord, text in comments.items():
+            notes[coord] = (notes.get(coord, (None, None))[0], text)
+    return notes
+
+
+_CELL_TAG = f"{{{SHEET_MAIN_NS}}}c"
+_FORMULA_TAG = f"{{{SHEET_MAIN_NS}}}f"
+_VALUE_TAG = f"{{{SHEET_MAIN_NS}}}v"
+_INLINE_TAG = f"{{{SHEET_MAIN_NS}}}is"
+_ROW_CONTENT_TAGS = frozenset((_CELL_TAG, _VALUE_TAG, _FORMULA_TAG))
+
+
+def _scan_worksheet(zf, path, include_tables):
+    merged = []
+    frozen = None
+    seen_pane = False
+    table_ids = []
+    links = []
+    # The <dimension> tag is often stale, so the used range comes from the cells themselves
+    min_row = min_col = None
+    max_row = max_col = 0
+    row_idx = 0
+    has_values = False
+    with zf.open(path) as src:
+        for _, el in iterparse(src):
+            if el.tag in _ROW_CONTENT_TAGS:
+                # Handled with their row below; skips the tag split for most elements
+                continue
+            tag = _local(el.tag)
+            if tag == "row":
+                r = el.get("r")
+                row_idx = int(r) if r else row_idx + 1
+                cells = el.findall(_CELL_TAG)
+                if cells:
+                    first, last = cells[0].get("r"), cells[-1].get("r")
+                    if first and last:
+                        # Cells of a row are stored in column order
+                        row_idx, lo = coordinate_to_tuple(first)
+                        row_idx, hi = coordinate_to_tuple(last)
+                    else:
+                        # Cells without a reference follow the previous cell, as openpyxl counts them
+                        cols = []
+                        col_idx = 0
+                        for c in cells:
+                            ref = c.get("r")
+                            if ref:
+                                row_idx, col_idx = coordinate_to_tuple(ref)
+                            else:
+                                col_idx += 1
+                            cols.append(col_idx)
+                        lo, hi = min(cols), max(cols)
+                    if min_row is None:
+                        min_row = row_idx
+                    if min_col is None or lo < min_col:
+                        min_col = lo
+                    if hi > max_col:
+                        max_col = hi
+                    max_row = row_idx
+                    if not has_values:
+                        has_values = any(
+                            c.find(_VALUE_TAG) is not None or c.find(_INLINE_TAG) is not None for c in cells
+                        )
+                # Cell data is streamed elsewhere; drop it as soon as the row is parsed
+                el.clear()
+            elif tag == "mergeCell":
+                merged.append(el.get("ref"))
+            elif tag == "pane" and not seen_pane:
+                frozen = el.get("topLeftCell")
+                seen_pane = True
+            elif tag == "tablePart":
+                table_ids.append(_rel_id(el))
+            elif tag == "hyperlink":
+                links.append((el.get("ref"), _rel_id(el)))
+
+    # Read-only workbooks carry no comments or hyperlinks; take them from the package
+    rels = _part_rels(zf, path, external=True)
+    notes = _scan_notes(zf, rels, links, merged)
+
+    tables = []
+    if include_tables and table_ids:
+        for rid in table_ids:
+            if rid in rels:
+                try:
+                    tables.append(_scan_table(zf, rels[rid][1]))
+                except KeyError:
+                    pass
+    # Merged ranges and annotated cells count towards the used range, matching a full load
+    for ref in chain(merged, notes):
+        m_col, m_row, x_col, x_row = range_boundaries(ref)
+        min_row = m_row if min_row is None else min(min_row, m_row)
+        min_col = m_col if min_col is None else min(min_col, m_col)
+        max_row = max(max_row, x_row)
+        max_col = max(max_col, x_col)
+    dims = "A1:A1"
+    if min_row is not None:
+        dims = f"{_COL_LETTERS[min_col]}{min_row}:{_COL_LETTERS[max_col]}{max_row}"
+    return {
+        "dims": dims,
+        "has_values": has_values,
+        "frozen_panes": frozen,
+        "merged_ranges": merged,
+        "tables": tables,
+        "notes": notes,
+    }
+
+
+def _scan_structure(file_bytes, include_tables=True):
+    """Read panes, merged ranges, tables and cell notes per sheet straight from the package XML.
+
+    Read-only workbooks do not expose these, and a full openpyxl load would
+    build every cell object just to reach them.
+    """
+    structure = {}
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as zf:
+        wb_path = next(path for kind, path in _part_rels(zf, "").values() if kind == "officeDocument")
+        wb_rels = _part_rels(zf, wb_path)
+        with zf.open(wb_path) as src:
+            sheet_paths = [
+                (el.get("name"), wb_rels[_rel_id(el)][1])
+                for _, el in iterparse(src)
+                if _local(el.tag) == "sheet" and _rel_id(el) in wb_rels
+            ]
+        for name, path in sheet_paths:
+            structure[name] = _scan_worksheet(zf, path, include_tables)
+    return structure
+
+
 def _extract_named_ranges(wb):
     named = []
     try:
@@ -205,6 +448,127 @@ def _extract_named_ranges(wb):
     return named
 
 
+def _process_sheet(
+    books,
+    sheet,
+    structure,
+    include_formulas=True,
+    include_cells=True,
+    include_comments=True,
+    include_excel_tables=True,
+    include_inferred_sections=True,
+    chunk_max_cells=400,
+):
+    wb_values, wb_formula = books
+    ws = wb_values[sheet]
+    ws_f = wb_formula[sheet] if wb_formula is not None else None
+    # A stale <dimension> tag would otherwise clip every row read below
+    ws.reset_dimensions()
+    if ws_f is not None:
+        ws_f.reset_dimensions()
+
+    sheet_obj = {}
+    sheet_obj["dims"] = structure["dims"]
+    sheet_obj["frozen_panes"] = structure["frozen_panes"]
+    sheet_obj["merged_ranges"] = structure["merged_ranges"]
+
+    # Templates often carry blank helper sheets; skip reading rows that hold no values
+    is_blank = not structure["has_values"]
+
+    # Section input is gathered while the cells are read, so the sheet is streamed once
+    need_sections = include_inferred_sections and not is_blank
+    row_map = {}
+    text_cols = {}
+    rows = ws.iter_rows(values_only=True)
+    if need_sections:
+        rows = _tap_text_map(rows, row_map, text_cols)
+
+    lineage_nodes = []
+    if include_cells and is_blank:
+        sheet_obj["cells"] = {}
+    elif include_cells and not include_formulas and not include_comments:
+        # Only values are needed: no formula twin or annotation lookups
+        cells = {}
+        for r, row in enumerate(rows, 1):
+            for col, v in enumerate(row, 1):
+                if v in (None, ""):
+                    continue
+                cells[f"{_COL_LETTERS[col]}{r}"] = CellRec(*_cell_fields(v))
+        sheet_obj["cells"] = cells
+    elif include_cells:
+        notes = structure["notes"] if include_comments else {}
+        # Without formulas every value row is paired with an endless run of None twins
+        rows_f = ws_f.iter_rows(values_only=True) if ws_f is not None else repeat(repeat(None))
+        cells = {}
+        for r, (row_v, row_f) in enumerate(zip(rows, rows_f), 1):
+            for col, (v, v_f) in enumerate(zip(row_v, row_f), 1):
+                if v is None or v == "":
+                    continue
+                addr = f"{_COL_LETTERS[col]}{r}"
+                val, t, display = _cell_fields(v)
+                fv = None
+                deps = ()
+                if type(v_f) is str and v_f.startswith("="):
+                    fv = v_f
+                    deps = _formula_deps(fv)
+                    lineage_nodes.append({"cell": addr, "formula": fv, "deps": deps})
+                hyperlink, comment = notes.get(addr, (None, None))
+                cells[addr] = CellRec(val, t, display, fv, deps, hyperlink, comment, include_comments)
+        sheet_obj["cells"] = cells
+    elif need_sections:
+        for _ in rows:
+            pass
+
+    excel_tables = structure["tables"] if include_excel_tables else []
+    sheet_obj["tables"] = excel_tables
+
+    sections = _detect_text_sections(row_map, text_cols) if need_sections else []
+    sheet_obj["sections"] = sections
+
+    if include_formulas and include_cells:
+        sheet_obj["lineage"] = {"nodes": lineage_nodes}
+
+    chunks = _sheet_chunks(sheet, ws, excel_tables, sections, max_cells=chunk_max_cells)
+    sheet_obj["chunks"] = chunks
+
+    return sheet_obj
+
+
+# Workbooks opened once per pool worker, reused for every sheet it is handed
+_worker_books = None
+
+
+def _init_sheet_worker(file_bytes, needs_formulas):
+    global _worker_books
+    wb_values, wb_formula = _open_workbooks(file_bytes, needs_formulas)
+    _worker_books = (wb_values, wb_formula)
+
+
+def _process_sheet_in_worker(sheet, structure, **options):
+    return _process_sheet(_worker_books, sheet, structure, **options)
+
+
+# Below this size forking workers costs more than extracting serially
+_PARALLEL_MIN_BYTES = 1 << 20
+
+
+def _extract_sheets(file_bytes, wb_values, wb_formula, sheetnames, structures, options):
+    workers = min(len(sheetnames), os.cpu_count() or 1)
+    if workers > 1 and len(file_bytes) >= _PARALLEL_MIN_BYTES:
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_sheet_worker,
+                initargs=(file_bytes, wb_formula is not None),
+            ) as pool:
+                return list(pool.map(functools.partial(_process_sheet_in_worker, **options), sheetnames, structures))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # Some serverless sandboxes cannot start worker processes; fall back to serial
+            pass
+    books = (wb_values, wb_formula)
+    return [_process_sheet(books, sheet, structure, **options) for sheet, structure in zip(sheetnames, structures)]
+
+
 def extract_excel_ai(
     file_bytes: bytes,
     include_formulas: bool = True,
@@ -216,7 +580,8 @@ def extract_excel_ai(
     chunk_max_cells: int = 400,
     file_name: str = "workbook"
 ):
-    wb_values, wb_formula = _open_workbooks(file_bytes)
+    # The formula twin is only read when formulas are attached to extracted cells
+    wb_values, wb_formula = _open_workbooks(file_bytes, needs_formulas=include_formulas and include_cells)
 
     meta = {
         "title": file_name,
@@ -230,70 +595,62 @@ def extract_excel_ai(
     if include_named_ranges:
         out["named_ranges"] = _extract_named_ranges(wb_values)
 
-    for sheet in wb_values.sheetnames:
-        ws = wb_values[sheet]
-        ws_f = wb_formula[sheet]
-
-        sheet_obj = {}
-        sheet_obj["dims"] = ws.calculate_dimension()
-        sheet_obj["frozen_panes"] = getattr(ws, "freeze_panes", None)
-        sheet_obj["merged_ranges"] = [str(rng) for rng in ws.merged_cells.ranges]
-
-        if include_cells:
-            cells = {}
-            for c in _iter_non_empty(ws):
-                addr = c.coordinate
-                val = _safe_val(c.value)
-                t = _cell_type(c.value)
-                item = {"v": val, "t": t, "display": str(c.value) if c.value is not None else ""}
-                if include_formulas:
-                    c_f = ws_f[addr]
-                    fv = c_f.value if (isinstance(c_f.value, str) and str(c_f.value).startswith("=")) else None
-                    if fv:
-                        item["f"] = fv
-                        item["deps"] = _formula_deps(fv)
-                if include_comments:
-                    item["hyperlink"] = c.hyperlink.target if c.hyperlink else None
-                    item["comment"] = c.comment.text if c.comment else None
-                cells[addr] = item
-            sheet_obj["cells"] = cells
-
-        excel_tables = []
-        if include_excel_tables and getattr(ws, "tables", None):
-            try:
-                from openpyxl.utils.cell import range_boundaries
-                for name, tbl in ws.tables.items():
-                    rng = tbl.ref
-                    min_col, min_row, max_col, max_row = range_boundaries(rng)
-                    headers = []
-                    for c in ws.iter_cols(min_col=min_col, max_col=max_col, min_row=min_row, max_row=min_row):
-                        headers.append(str(c[0].value) if c and c[0].value is not None else "")
-                    excel_tables.append({
-                        "name": getattr(tbl, "displayName", None) or name,
-                        "range": rng,
-                        "headers": headers,
-                        "records": []
-                    })
-            except Exception:
-                pass
-        sheet_obj["tables"] = excel_tables
+    options = {
+        "include_formulas": include_formulas,
+        "include_cells": include_cells,
+        "include_comments": include_comments,
+        "include_excel_tables": include_excel_tables,
+        "include_inferred_sections": include_inferred_sections,
+        "chunk_max_cells": chunk_max_cells,
+    }
+    sheetnames = wb_values.sheetnames
+    scanned = _scan_structure(file_bytes, include_tables=include_excel_tables)
+    structures = [scanned[sheet] for sheet in sheetnames]
+    sheet_objs = _extract_sheets(file_bytes, wb_values, wb_formula, sheetnames, structures, options)
+    for sheet, sheet_obj in zip(sheetnames, sheet_objs):
+        out["sheets"][sheet] = sheet_obj
 
-        sections = _detect_text_sections(ws) if include_inferred_sections else []
-        sheet_obj["sections"] = sections
+    wb_values.close()
+    if wb_formula is not None:
+        wb_formula.close()
+    return out
 
-        if include_formulas and include_cells:
-            lineage_nodes = []
-            for addr, item in sheet_obj.get("cells", {}).items():
-                if "f" in item and item["f"]:
-                    lineage_nodes.append({"cell": addr, "formula": item["f"], "deps": item.get("deps", [])})
-            sheet_obj["lineage"] = {"nodes": lineage_nodes}
 
-        chunks = _sheet_chunks(sheet, ws, excel_tables, sections, max_cells=chunk_max_cells)
-        sheet_obj["chunks"] = chunks
+def _json_default(v):
+    if isinstance(v, CellRec):
+        return v.to_json()
+    return v.isoformat() if hasattr(v, "isoformat") else str(v)
 
-        out["sheets"][sheet] = sheet_obj
 
-    return out
+# Serialized responses for recent uploads, keyed by content hash and options.
+# Kept small because warm serverless instances have tight memory limits.
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_SIZE = 16
+
+
+def _cache_get(key):
+    body = _RESPONSE_CACHE.get(key)
+    if body is not None:
+        _RESPONSE_CACHE.move_to_end(key)
+    return body
+
+
+def _cache_put(key, body):
+    _RESPONSE_CACHE[key] = body
+    _RESPONSE_CACHE.move_to_end(key)
+    while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+        _RESPONSE_CACHE.popitem(last=False)
+
+
+_FORM_FIELDS = (
+    'include_formulas',
+    'include_cells',
+    'include_comments',
+    'include_named_ranges',
+    'include_excel_tables',
+    'include_inferred_sections',
+    'chunk_max_cells',
+)
 
 
 class handler(BaseHTTPRequestHandler):
@@ -312,28 +669,37 @@ class handler(BaseHTTPRequestHandler):
                 self.send_error(400, 'Content-Type must be multipart/form-data')
                 return
 
-            # Parse multipart form data
-            form = cgi.FieldStorage(
-                fp=self.rfile,
-                headers=self.headers,
-                environ={
-                    'REQUEST_METHOD': 'POST',
-                    'CONTENT_TYPE': content_type,
-                }
-            )
+            # Parse multipart form data as it streams in, without a temp file
+            parser = StreamingFormDataParser(headers=self.headers)
+            file_target = ValueTarget()
+            parser.register('file', file_target)
+            fields = {key: ValueTarget() for key in _FORM_FIELDS}
+            for key, target in fields.items():
+                parser.register(key, target)
+
+            remaining = int(self.headers.get('Content-Length', 0))
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, 65536))
+                if not chunk:
+                    break
+                parser.data_received(chunk)
+                remaining -= len(chunk)
 
             # Get file
-            file_item = form['file']
-            if not file_item.file:
+            file_bytes = file_target.value
+            if not file_bytes:
                 self.send_error(400, 'No file uploaded')
                 return
 
-            file_bytes = file_item.file.read()
-            file_name = file_item.filename or 'workbook.xlsx'
+            file_name = file_target.multipart_filename or 'workbook.xlsx'
 
             # Get options
+            def get_value(key, default):
+                val = fields[key].value
+                return val.decode() if val else default
+
             def get_bool(key, default=True):
-                val = form.getvalue(key, str(default))
+                val = get_value(key, str(default))
                 return val.lower() == 'true'
 
             include_formulas = get_bool('include_formulas', True)
@@ -342,35 +708,54 @@ class handler(BaseHTTPRequestHandler):
             include_named_ranges = get_bool('include_named_ranges', True)
             include_excel_tables = get_bool('include_excel_tables', True)
             include_inferred_sections = get_bool('include_inferred_sections', True)
-            chunk_max_cells = int(form.getvalue('chunk_max_cells', '400'))
-
-            # Process
-            result = extract_excel_ai(
-                file_bytes=file_bytes,
-                include_formulas=include_formulas,
-                include_cells=include_cells,
-                include_comments=include_comments,
-                include_named_ranges=include_named_ranges,
-                include_excel_tables=include_excel_tables,
-                include_inferred_sections=include_inferred_sections,
-                chunk_max_cells=chunk_max_cells,
-                file_name=file_name
+            chunk_max_cells = int(get_value('chunk_max_cells', '400'))
+
+            # Repeat uploads of the same file and options reuse the serialized response
+            cache_key = (
+                hashlib.blake2b(file_bytes, digest_size=16).hexdigest(),
+                file_name,
+                include_formulas,
+                include_cells,
+                include_comments,
+                include_named_ranges,
+                include_excel_tables,
+                include_inferred_sections,
+                chunk_max_cells,
             )
+            response_body = _cache_get(cache_key)
+
+            if response_body is None:
+                # Process
+                result = extract_excel_ai(
+                    file_bytes=file_bytes,
+                    include_formulas=include_formulas,
+                    include_cells=include_cells,
+                    include_comments=include_comments,
+                    include_named_ranges=include_named_ranges,
+                    include_excel_tables=include_excel_tables,
+                    include_inferred_sections=include_inferred_sections,
+                    chunk_max_cells=chunk_max_cells,
+                    file_name=file_name
+                )
+
+                _formula_deps.cache_clear()
+
+                response_body = orjson.dumps(result, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+                _cache_put(cache_key, response_body)
 
             # Send response
-            response_body = json.dumps(result, default=str, ensure_ascii=False)
-            
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(response_body)))
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            self.wfile.write(response_body.encode('utf-8'))
+            self.wfile.write(response_body)
 
         except Exception as e:
             self.send_response(500)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            error_response = json.dumps({'error': str(e)})
-            self.wfile.write(error_response.encode('utf-8'))
+            error_response = orjson.dumps({'error': str(e)})
+            self.wfile.write(error_response)
 
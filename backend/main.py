@@ -1,25 +1,71 @@
 """
 Excel to AI-Ready JSON Converter - FastAPI Backend
 """
-import json
 import io
+import mmap
 import os
 import re
-import hashlib
-from datetime import datetime
+import posixpath
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from itertools import chain
 from typing import Optional
 
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+import orjson
+import xxhash
+from cachetools import TTLCache
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
-import pandas as pd
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from openpyxl import load_workbook
+from openpyxl.utils.cell import get_column_letter, range_boundaries
+from openpyxl.xml.constants import SHEET_MAIN_NS
+from openpyxl.xml.functions import iterparse
 from pydantic import BaseModel
 
+# Pool shared by all requests; created in the app lifespan so workers are forked once
+_sheet_pool: Optional[ProcessPoolExecutor] = None
+_sheet_pool_size = 0
+# Below this size re-opening the workbook in every worker costs more than it saves
+_PARALLEL_MIN_BYTES = 1 << 20
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _sheet_pool, _sheet_pool_size
+    # Split the cores between server worker processes so pools do not oversubscribe
+    server_workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+    pool_workers = (os.cpu_count() or 1) // server_workers
+    # A one-process pool only adds pickling on top of serial extraction
+    if pool_workers >= 2:
+        _sheet_pool = ProcessPoolExecutor(max_workers=pool_workers)
+        _sheet_pool_size = pool_workers
+    try:
+        yield
+    finally:
+        if _sheet_pool is not None:
+            _sheet_pool.shutdown(cancel_futures=True)
+            _sheet_pool = None
+            _sheet_pool_size = 0
+
+
 app = FastAPI(
     title="Excel to JSON Converter",
     description="Convert Excel files to AI-ready JSON with formulas, tables, and RAG chunks",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS for frontend
@@ -31,38 +77,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cell-level JSON is highly repetitive and compresses to a small fraction on the wire
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+
 # ---------------- Helpers ----------------
 
-CELL_REF_RE = re.compile(r"\$?[A-Z]{1,3}\$?\d+")
+# One alternation (range first) so each formula is scanned once
+DEPS_RE = re.compile(r"(\$?[A-Z]{1,3}\$?\d+):(\$?[A-Z]{1,3}\$?\d+)|\$?[A-Z]{1,3}\$?\d+")
 RANGE_RE = re.compile(r"(\$?[A-Z]{1,3}\$?\d+):(\$?[A-Z]{1,3}\$?\d+)")
+# Column letters by 1-based index for every Excel column (max 16384)
+_COL_LETTER_CACHE = [None] + [get_column_letter(i) for i in range(1, 16385)]
 
 
 def _hash_id(*parts):
-    h = hashlib.sha1("::".join(str(p) for p in parts).encode()).hexdigest()[:4]
-    return h
-
+    return xxhash.xxh3_64_hexdigest("::".join(map(str, parts)).encode())[:4]
 
-def _iter_non_empty(ws):
-    for row in ws.iter_rows():
-        for c in row:
-            if c.value not in (None, ""):
-                yield c
 
-
-def _cell_type(v):
-    if isinstance(v, (int, float)) and not isinstance(v, bool):
-        return "number"
-    if isinstance(v, bool):
-        return "bool"
-    if isinstance(v, (datetime, pd.Timestamp)):
-        return "datetime"
-    return "str"
+# Exact type -> cell type; bool is its own key, so it never falls into "number"
+_TYPE_MAP = {int: "number", float: "number", bool: "bool", str: "str", datetime: "datetime"}
+# Exact type -> JSON-safe conversion
+_SAFE_VAL_MAP = {datetime: datetime.isoformat}
 
 
 def _safe_val(v):
-    if isinstance(v, (datetime, pd.Timestamp)):
-        return v.isoformat()
-    return v
+    conv = _SAFE_VAL_MAP.get(type(v))
+    return conv(v) if conv is not None else v
 
 
 def _coord_to_tuple(coord):
@@ -70,94 +109,116 @@ def _coord_to_tuple(coord):
     return coordinate_to_tuple(coord)
 
 
-def _tuple_to_coord(rc):
-    from openpyxl.utils.cell import get_column_letter
-    r, c = rc
-    return f"{get_column_letter(c)}{r}"
+def _parse_ref(ref):
+    """(row, col) of an A1-style reference such as 'B12' or '$B$12', without regex."""
+    col = 0
+    i = 0
+    for ch in ref:
+        if ch == "$":
+            pass
+        elif "A" <= ch <= "Z":
+            col = col * 26 + ord(ch) - 64
+        else:
+            break
+        i += 1
+    return int(ref[i:]), col
 
 
-def _expand_range(rg):
-    """Return list of cell addresses in a range like 'A1:C3'."""
-    from openpyxl.utils.cell import coordinate_to_tuple, get_column_letter
+def _expand_range(rg, limit=None):
+    """Return list of cell addresses in a range like 'A1:C3', at most ``limit`` of them."""
     m = RANGE_RE.match(rg)
     if not m:
         return []
-    a, b = m.group(1), m.group(2)
-    r1, c1 = coordinate_to_tuple(a)
-    r2, c2 = coordinate_to_tuple(b)
+    r1, c1 = _parse_ref(m.group(1))
+    r2, c2 = _parse_ref(m.group(2))
+    if r1 > r2:
+        r1, r2 = r2, r1
+    if c1 > c2:
+        c1, c2 = c2, c1
+    letters = _COL_LETTER_CACHE[c1:c2 + 1]
     cells = []
-    for r in range(min(r1, r2), max(r1, r2) + 1):
-        for c in range(min(c1, c2), max(c1, c2) + 1):
-            cells.append(f"{get_column_letter(c)}{r}")
+    for r in range(r1, r2 + 1):
+        cells.extend([f"{letter}{r}" for letter in letters])
+        if limit is not None and len(cells) >= limit:
+            del cells[limit:]
+            break
     return cells
 
 
 def _formula_deps(formula):
     """Extract cell/range references from a formula string."""
-    if not formula or not isinstance(formula, str) or not formula.startswith("="):
+    if not isinstance(formula, str) or formula[:1] != "=":
         return []
-    refs = set()
-    for m in CELL_REF_RE.finditer(formula):
-        refs.add(m.group(0))
-    for m in RANGE_RE.finditer(formula):
-        refs.add(f"{m.group(1)}:{m.group(2)}")
-    return sorted(refs)
+    # dict as an ordered set: deps keep their first-appearance order
+    refs = {}
+    for m in DEPS_RE.finditer(formula):
+        refs[f"{m.group(1)}:{m.group(2)}" if m.group(1) else m.group(0)] = None
+    return list(refs)
+
+
+def _emit_block(rmin, rmax, cmin, cmax, cells_map):
+    """Section dict for one rectangular block, or None if it holds no text."""
+    get = cells_map.get
+    text_lines = []
+    for rr in range(rmin, rmax + 1):
+        line = [v for v in (get((rr, cc)) for cc in range(cmin, cmax + 1)) if v is not None]
+        if line:
+            text_lines.append(" ".join(line))
+    if not text_lines:
+        return None
+    rng = f"{_COL_LETTER_CACHE[cmin]}{rmin}:{_COL_LETTER_CACHE[cmax]}{rmax}"
+    return {"range": rng, "text": "\n".join(text_lines)}
+
+
+def _tap_text_map(rows, cells_map, text_rows):
+    """Pass value rows through unchanged while recording non-blank values as str by
+    (row, col) and text columns by row, so cell extraction and the text map share a pass."""
+    for ri, row in enumerate(rows, 1):
+        for ci, v in enumerate(row, 1):
+            if v is None or v == "":
+                continue
+            if isinstance(v, str):
+                # Whitespace-only strings count as blank, so blocks never re-check them
+                if v.strip():
+                    cells_map[(ri, ci)] = v
+                    text_rows.setdefault(ri, []).append(ci)
+            else:
+                cells_map[(ri, ci)] = str(v)
+        yield row
 
 
-def _detect_text_sections(ws):
-    """Group contiguous non-empty text-ish cells into simple rectangular sections."""
-    rows = {}
-    for c in _iter_non_empty(ws):
-        if isinstance(c.value, str) and c.value.strip():
-            rows.setdefault(c.row, []).append(c)
+def _sheet_text_map(rows):
+    """One pass over a sheet: non-blank values as str by (row, col) and text columns by row."""
+    cells_map = {}
+    text_rows = {}
+    for _ in _tap_text_map(rows, cells_map, text_rows):
+        pass
+    return cells_map, text_rows
 
+
+def _emit_rows(block_rows, rows, cells_map, sections):
+    """Emit the block spanning consecutive ``block_rows`` and their text columns."""
+    cmin = min(min(rows[rr]) for rr in block_rows)
+    cmax = max(max(rows[rr]) for rr in block_rows)
+    section = _emit_block(block_rows[0], block_rows[-1], cmin, cmax, cells_map)
+    if section is not None:
+        sections.append(section)
+
+
+def _detect_text_sections(cells_map, rows):
+    """Group contiguous non-empty text-ish cells into simple rectangular sections."""
     sections = []
     if not rows:
         return sections
 
+    # Walk only the rows that hold text; a gap in the sorted indices closes a block
     current_block_rows = []
-    for r in range(1, ws.max_row + 1):
-        if r in rows:
-            current_block_rows.append(r)
-        else:
-            if current_block_rows:
-                rmin, rmax = min(current_block_rows), max(current_block_rows)
-                cmin = min(min(c.column for c in rows[rr]) for rr in current_block_rows)
-                cmax = max(max(c.column for c in rows[rr]) for rr in current_block_rows)
-                text_lines = []
-                for rr in range(rmin, rmax + 1):
-                    line = []
-                    for cc in range(cmin, cmax + 1):
-                        addr = _tuple_to_coord((rr, cc))
-                        val = ws[addr].value
-                        if val is not None and str(val).strip():
-                            line.append(str(val))
-                    if line:
-                        text_lines.append(" ".join(line))
-                if text_lines:
-                    from openpyxl.utils.cell import get_column_letter
-                    rng = f"{get_column_letter(cmin)}{rmin}:{get_column_letter(cmax)}{rmax}"
-                    sections.append({"range": rng, "text": "\n".join(text_lines)})
-                current_block_rows = []
-
-    if current_block_rows:
-        rmin, rmax = min(current_block_rows), max(current_block_rows)
-        cmin = min(min(c.column for c in rows[rr]) for rr in current_block_rows)
-        cmax = max(max(c.column for c in rows[rr]) for rr in current_block_rows)
-        text_lines = []
-        for rr in range(rmin, rmax + 1):
-            line = []
-            for cc in range(cmin, cmax + 1):
-                addr = _tuple_to_coord((rr, cc))
-                val = ws[addr].value
-                if val is not None and str(val).strip():
-                    line.append(str(val))
-            if line:
-                text_lines.append(" ".join(line))
-        if text_lines:
-            from openpyxl.utils.cell import get_column_letter
-            rng = f"{get_column_letter(cmin)}{rmin}:{get_column_letter(cmax)}{rmax}"
-            sections.append({"range": rng, "text": "\n".join(text_lines)})
+    for r in sorted(rows):
+        if current_block_rows and r != current_block_rows[-1] + 1:
+            _emit_rows(current_block_rows, rows, cells_map, sections)
+            current_block_rows = []
+        current_block_rows.append(r)
+    _emit_rows(current_block_rows, rows, cells_map, sections)
 
     return sections
 
@@ -177,7 +238,7 @@ def _sheet_chunks(sheet_name, ws, excel_tables, sections, max_cells=400):
             "sheet": sheet_name,
             "range": t["range"],
             "text": text,
-            "cells": _expand_range(t["range"])[:max_cells]
+            "cells": _expand_range(t["range"], limit=max_cells)
         })
 
     for s in sections:
@@ -187,20 +248,433 @@ def _sheet_chunks(sheet_name, ws, excel_tables, sections, max_cells=400):
             "sheet": sheet_name,
             "range": s["range"],
             "text": s["text"],
-            "cells": _expand_range(s["range"])[:max_cells]
+            "cells": _expand_range(s["range"], limit=max_cells)
         })
 
     return chunks
 
 
-def _open_workbooks(file_bytes):
-    b1 = io.BytesIO(file_bytes)
-    wb_values = load_workbook(b1, data_only=True)
-    b2 = io.BytesIO(file_bytes)
-    wb_formulas = load_workbook(b2, data_only=False)
+def _spool_upload(src):
+    """Copy an upload stream into a named temporary file; return (path, content hash).
+
+    Empty uploads are rejected with a 400, since an empty file cannot be mapped.
+    """
+    h = xxhash.xxh3_128()
+    size = 0
+    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp:
+        try:
+            while True:
+                buf = src.read(1 << 20)
+                if not buf:
+                    break
+                h.update(buf)
+                tmp.write(buf)
+                size += len(buf)
+            if not size:
+                raise HTTPException(status_code=400, detail="Uploaded file is empty")
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+    return tmp.name, h.hexdigest()
+
+
+class _Mapping(mmap.mmap):
+    """mmap usable as a zipfile source (mmap only gained ``seekable`` in 3.13)."""
+
+    def seekable(self):
+        return True
+
+    def seek(self, pos, whence=0):
+        # zipfile probes for the end-of-central-directory record and only treats OSError
+        # as "too short"; mmap raises ValueError, which would surface as a 500
+        try:
+            return super().seek(pos, whence)
+        except ValueError as e:
+            raise OSError(str(e)) from None
+
+
+def _map_file(path):
+    """Read-only mmap of a spooled upload; pages are loaded on demand and shared."""
+    with open(path, "rb") as f:
+        return _Mapping(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _as_stream(data):
+    """File-like view of workbook bytes; an mmap is passed through as-is."""
+    # zipfile seeks before every read, so several archives can share one mapping
+    return io.BytesIO(data) if isinstance(data, bytes) else data
+
+
+def _open_workbooks(file_bytes, need_formulas: bool):
+    """Open streaming read-only workbooks for values and, if needed, formulas."""
+    wb_values = load_workbook(_as_stream(file_bytes), data_only=True, read_only=True, keep_links=False)
+    if not need_formulas:
+        return wb_values, None
+    wb_formulas = load_workbook(_as_stream(file_bytes), data_only=False, read_only=True, keep_links=False)
     return wb_values, wb_formulas
 
 
+def _local(tag):
+    """Strip the XML namespace from a tag or attribute name."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _rel_id(el):
+    """Return the r:id attribute of an element, whatever its namespace prefix."""
+    for key, value in el.attrib.items():
+        if _local(key) == "id":
+            return value
+    return None
+
+
+def _part_rels(zf, part, external=False):
+    """Map relationship ids of an archive part to (relationship type, target path).
+
+    External targets (hyperlink URLs) are skipped unless ``external`` is set, and
+    are then kept verbatim.
+    """
+    folder, name = posixpath.split(part)
+    rels = {}
+    try:
+        src = zf.open(posixpath.join(folder, "_rels", name + ".rels"))
+    except KeyError:
+        return rels
+    with src:
+        for _, el in iterparse(src):
+            if _local(el.tag) != "Relationship":
+                continue
+            target = el.get("Target", "")
+            if el.get("TargetMode") == "External":
+                if not external:
+                    continue
+                path = target
+            elif target.startswith("/"):
+                path = target[1:]
+            else:
+                path = posixpath.normpath(posixpath.join(folder, target))
+            rels[el.get("Id")] = (el.get("Type", "").rsplit("/", 1)[-1], path)
+    return rels
+
+
+def _scan_table(zf, path):
+    """Return name, range and column headers of an Excel table part."""
+    tbl = {}
+    headers = []
+    with zf.open(path) as src:
+        for _, el in iterparse(src):
+            tag = _local(el.tag)
+            if tag == "tableColumn":
+                headers.append(el.get("name") or "")
+            elif tag == "table":
+                tbl = {"name": el.get("displayName") or el.get("name"), "range": el.get("ref")}
+    tbl["headers"] = headers
+    return tbl
+
+
+def _text_nodes(el):
+    """<t> elements of a rich-text container (<si>, <is>, comment <text>), skipping phonetic runs."""
+    for child in el:
+        tag = _local(child.tag)
+        if tag == "t":
+            yield child
+        elif tag == "r":
+            yield from (t for t in child if _local(t.tag) == "t")
+
+
+def _scan_comments(zf, path):
+    """Map cell references of a comments part to the comment's plain text."""
+    comments = {}
+    with zf.open(path) as src:
+        for _, el in iterparse(src):
+            if _local(el.tag) != "comment":
+                continue
+            snippets = []
+            for text in el:
+                if _local(text.tag) == "text":
+                    snippets.extend(t.text or "" for t in _text_nodes(text))
+            comments[el.get("ref")] = "".join(snippets)
+            el.clear()
+    return comments
+
+
+def _scan_notes(zf, rels, links, merged):
+    """Map coordinates to (hyperlink, comment) from a sheet's <hyperlink> entries and comments part."""
+    notes = {}
+    bounds = [range_boundaries(ref) for ref in merged] if links else []
+    for ref, rid in links:
+        target = rels[rid][1] if rid in rels else None
+        if ":" in ref:
+            coords = _expand_range(ref)
+        else:
+            row, col = _parse_ref(ref)
+            # A link on a merged cell belongs to the range's top-left cell
+            for m_col, m_row, x_col, x_row in bounds:
+                if m_row <= row <= x_row and m_col <= col <= x_col:
+                    row, col = m_row, m_col
+                    break
+            coords = [f"{_COL_LETTER_CACHE[col]}{row}"]
+        for coord in coords:
+            notes[coord] = (target, None)
+    for kind, part in rels.values():
+        if kind != "comments":
+            continue
+        try:
+            comments = _scan_comments(zf, part)
+        except KeyError:
+            continue
+        for coord, text in comments.items():
+            notes[coord] = (notes.get(coord, (None, None))[0], text)
+    return notes
+
+
+_CELL_TAG = f"{{{SHEET_MAIN_NS}}}c"
+_FORMULA_TAG = f"{{{SHEET_MAIN_NS}}}f"
+_VALUE_TAG = f"{{{SHEET_MAIN_NS}}}v"
+_INLINE_TAG = f"{{{SHEET_MAIN_NS}}}is"
+_ROW_CONTENT_TAGS = frozenset((_CELL_TAG, _VALUE_TAG, _FORMULA_TAG))
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def _calamine_trims(t):
+    """calamine strips text nodes not marked xml:space="preserve"; openpyxl keeps them as-is."""
+    text = t.text
+    return bool(text) and text != text.strip() and t.get(_XML_SPACE) != "preserve"
+
+
+def _scan_trimmed_strings(zf, path):
+    """Indices of shared strings that calamine would read back trimmed."""
+    trimmed = set()
+    idx = 0
+    with zf.open(path) as src:
+        for _, el in iterparse(src):
+            if _local(el.tag) != "si":
+                continue
+            if any(_calamine_trims(t) for t in _text_nodes(el)):
+                trimmed.add(idx)
+            idx += 1
+            el.clear()
+    return trimmed
+
+
+def _calamine_differs(c, trimmed):
+    """Whether calamine would read cell element ``c`` differently from openpyxl.
+
+    Error (and ISO date) cells come back empty, unpreserved whitespace is trimmed,
+    and numbers are all floats: integral values written as floats ("1E+20", "3.0")
+    would turn into ints, and integers past float precision would lose digits.
+    """
+    t = c.get("t")
+    if t == "e" or t == "d":
+        return True
+    if t == "s":
+        v = c.find(_VALUE_TAG)
+        return v is not None and bool(v.text) and int(v.text) in trimmed
+    if t == "inlineStr":
+        inline = c.find(_INLINE_TAG)
+        return inline is not None and any(_calamine_trims(x) for x in _text_nodes(inline))
+    if t is None or t == "n":
+        v = c.find(_VALUE_TAG)
+        text = v.text if v is not None else None
+        if not text:
+            return False
+        if "." in text or "e" in text or "E" in text:
+            return float(text).is_integer()
+        return len(text.lstrip("-")) > 15
+    return False
+
+
+def _scan_worksheet(zf, path, include_tables, trimmed=None):
+    """Collect used range, panes, merged ranges, table parts and cell notes of one worksheet part.
+
+    With ``trimmed`` (see _scan_trimmed_strings) the cells are also checked for
+    values calamine would read differently from openpyxl.
+    """
+    merged = []
+    frozen = None
+    seen_pane = False
+    table_ids = []
+    links = []
+    # The <dimension> tag is often stale, so the used range comes from the cells themselves
+    min_row = min_col = None
+    max_row = max_col = 0
+    row_idx = 0
+    check_calamine = trimmed is not None
+    calamine_safe = check_calamine
+    with zf.open(path) as src:
+        for _, el in iterparse(src):
+            if el.tag in _ROW_CONTENT_TAGS:
+                # Handled with their row below; skips the tag split for most elements
+                continue
+            tag = _local(el.tag)
+            if tag == "row":
+                r = el.get("r")
+                row_idx = int(r) if r else row_idx + 1
+                cells = el.findall(_CELL_TAG)
+                if cells:
+                    first, last = cells[0].get("r"), cells[-1].get("r")
+                    if first and last:
+                        # Cells of a row are stored in column order
+                        row_idx, lo = _parse_ref(first)
+                        row_idx, hi = _parse_ref(last)
+                    else:
+                        # Cells without a reference follow the previous cell, as openpyxl counts them
+                        cols = []
+                        col_idx = 0
+                        for c in cells:
+                            ref = c.get("r")
+                            if ref:
+                                row_idx, col_idx = _parse_ref(ref)
+                            else:
+                                col_idx += 1
+                            cols.append(col_idx)
+                        lo, hi = min(cols), max(cols)
+                    if min_row is None:
+                        min_row = row_idx
+                    if min_col is None or lo < min_col:
+                        min_col = lo
+                    if hi > max_col:
+                        max_col = hi
+                    max_row = row_idx
+                if check_calamine:
+                    for c in cells:
+                        if _calamine_differs(c, trimmed):
+                            # One such cell is enough to read the whole sheet with openpyxl
+                            check_calamine = False
+                            calamine_safe = False
+                            break
+                # Cell data is streamed elsewhere; drop it as soon as the row is parsed
+                el.clear()
+            elif tag == "mergeCell":
+                merged.append(el.get("ref"))
+            elif tag == "pane" and not seen_pane:
+                frozen = el.get("topLeftCell")
+                seen_pane = True
+            elif tag == "tablePart":
+                table_ids.append(_rel_id(el))
+            elif tag == "hyperlink":
+                links.append((el.get("ref"), _rel_id(el)))
+
+    # Read-only workbooks carry no comments or hyperlinks; take them from the package
+    rels = _part_rels(zf, path, external=True)
+    notes = _scan_notes(zf, rels, links, merged)
+
+    tables = []
+    if include_tables and table_ids:
+        for rid in table_ids:
+            if rid in rels:
+                try:
+                    tables.append(_scan_table(zf, rels[rid][1]))
+                except KeyError:
+                    pass
+    # Merged ranges and annotated cells count towards the used range, matching a full load
+    for ref in chain(merged, notes):
+        m_col, m_row, x_col, x_row = range_boundaries(ref)
+        min_row = m_row if min_row is None else min(min_row, m_row)
+        min_col = m_col if min_col is None else min(min_col, m_col)
+        max_row = max(max_row, x_row)
+        max_col = max(max_col, x_col)
+    dims = "A1:A1"
+    if min_row is not None:
+        dims = f"{_COL_LETTER_CACHE[min_col]}{min_row}:{_COL_LETTER_CACHE[max_col]}{max_row}"
+    return {
+        "dims": dims,
+        "frozen_panes": frozen,
+        "merged_ranges": merged,
+        "tables": tables,
+        "notes": notes,
+        "calamine_safe": calamine_safe,
+    }
+
+
+def _scan_structure(file_bytes, include_tables=True, check_calamine=False):
+    """Read panes, merged ranges, tables and cell notes per sheet straight from the package XML.
+
+    Read-only workbooks do not expose these, and a full openpyxl load would
+    build every cell object just to reach them.  With ``check_calamine`` each
+    sheet is also flagged ``calamine_safe`` when calamine reads it like openpyxl.
+    """
+    structure = {}
+    with zipfile.ZipFile(_as_stream(file_bytes)) as zf:
+        wb_path = next(path for kind, path in _part_rels(zf, "").values() if kind == "officeDocument")
+        wb_rels = _part_rels(zf, wb_path)
+        with zf.open(wb_path) as src:
+            sheet_paths = [
+                (el.get("name"), wb_rels[_rel_id(el)][1])
+                for _, el in iterparse(src)
+                if _local(el.tag) == "sheet" and _rel_id(el) in wb_rels
+            ]
+        trimmed = None
+        if check_calamine:
+            trimmed = set()
+            for kind, path in wb_rels.values():
+                if kind == "sharedStrings":
+                    trimmed = _scan_trimmed_strings(zf, path)
+        for name, path in sheet_paths:
+            structure[name] = _scan_worksheet(zf, path, include_tables, trimmed)
+    return structure
+
+
+def _cell_item(v, _types=_TYPE_MAP, _safe=_SAFE_VAL_MAP):
+    """Base cell record for a non-empty value (maps bound as locals for the hot loop)."""
+    t = type(v)
+    conv = _safe.get(t)
+    return {"v": conv(v) if conv is not None else v, "t": _types.get(t, "str"), "display": str(v)}
+
+
+def _extract_cells(value_rows, formula_rows, notes, lineage_nodes):
+    """Build the cells dict from value-only rows (and the formula twin rows when given).
+
+    Formula cells are also appended to ``lineage_nodes`` in the same pass, sharing
+    the formula string and deps list with the cell record.
+
+    The formula/annotation branches are hoisted into separate loops so the
+    per-cell body carries no option checks.
+    """
+    cells = {}
+    cols = _COL_LETTER_CACHE
+    if formula_rows is None:
+        if notes is None:
+            for ri, row_v in enumerate(value_rows, 1):
+                for ci, v in enumerate(row_v, 1):
+                    if v is not None and v != "":
+                        cells[f"{cols[ci]}{ri}"] = _cell_item(v)
+        else:
+            for ri, row_v in enumerate(value_rows, 1):
+                for ci, v in enumerate(row_v, 1):
+                    if v is not None and v != "":
+                        addr = f"{cols[ci]}{ri}"
+                        item = _cell_item(v)
+                        item["hyperlink"], item["comment"] = notes.get(addr, (None, None))
+                        cells[addr] = item
+        return cells
+
+    rows = zip(value_rows, formula_rows)
+    if notes is None:
+        for ri, (row_v, row_f) in enumerate(rows, 1):
+            for ci, (v, fv) in enumerate(zip(row_v, row_f), 1):
+                if v is not None and v != "":
+                    item = _cell_item(v)
+                    addr = f"{cols[ci]}{ri}"
+                    if isinstance(fv, str) and fv.startswith("="):
+                        item["f"] = fv
+                        item["deps"] = deps = _formula_deps(fv)
+                        lineage_nodes.append({"cell": addr, "formula": fv, "deps": deps})
+                    cells[addr] = item
+    else:
+        for ri, (row_v, row_f) in enumerate(rows, 1):
+            for ci, (v, fv) in enumerate(zip(row_v, row_f), 1):
+                if v is not None and v != "":
+                    addr = f"{cols[ci]}{ri}"
+                    item = _cell_item(v)
+                    if isinstance(fv, str) and fv.startswith("="):
+                        item["f"] = fv
+                        item["deps"] = deps = _formula_deps(fv)
+                        lineage_nodes.append({"cell": addr, "formula": fv, "deps": deps})
+                    item["hyperlink"], item["comment"] = notes.get(addr, (None, None))
+                    cells[addr] = item
+    return cells
+
+
 def _extract_named_ranges(wb):
     """Return a list of named ranges from the workbook."""
     named = []
@@ -235,8 +709,165 @@ def _extract_named_ranges(wb):
 
 # ---------------- Core extractor ----------------
 
-def extract_excel_ai(
-    file_bytes: bytes,
+def _open_calamine(data):
+    """Rust-backed calamine workbook over the same bytes/mapping."""
+    if isinstance(data, bytes):
+        return CalamineWorkbook.from_filelike(io.BytesIO(data))
+    data.seek(0)
+    return CalamineWorkbook.from_filelike(data)
+
+
+def _calamine_value(v):
+    """Match openpyxl's values: integral numbers as int, dates as datetime."""
+    t = type(v)
+    if t is float:
+        return int(v) if v.is_integer() else v
+    if t is date:
+        return datetime(v.year, v.month, v.day)
+    if t is timedelta:
+        # Duration formats ([h]:mm) read as time/datetime in openpyxl
+        raise ValueError("calamine duration value")
+    return v
+
+
+def _calamine_rows(wb, sheet):
+    """Value rows of a sheet from calamine, anchored at A1; None if calamine cannot
+    read it the way openpyxl does."""
+    try:
+        rows = wb.get_sheet_by_name(sheet).to_python(skip_empty_area=False)
+        return [[_calamine_value(v) for v in row] for row in rows]
+    except Exception:
+        return None
+
+
+def _value_rows(ws, cal_rows):
+    """Value-only rows of a sheet, preferring already parsed calamine rows."""
+    return cal_rows if cal_rows is not None else ws.iter_rows(values_only=True)
+
+
+def _use_calamine(options: dict) -> bool:
+    """calamine has no formulas, so it only serves requests that do not attach them,
+    and only when cell values are read at all (cells, table records or sections)."""
+    need_formulas = options["include_formulas"] and options["include_cells"]
+    need_values = (
+        options["include_cells"] or options["include_excel_tables"] or options["include_inferred_sections"]
+    )
+    return CalamineWorkbook is not None and not need_formulas and need_values
+
+
+def _process_sheet(
+    books,
+    sheet: str,
+    structure: dict,
+    include_formulas: bool,
+    include_cells: bool,
+    include_comments: bool,
+    include_excel_tables: bool,
+    include_inferred_sections: bool,
+    chunk_max_cells: int,
+):
+    """Build the output object for one sheet from (values, formulas, calamine) workbooks."""
+    wb_values, wb_formula, wb_calamine = books
+    ws = wb_values[sheet]
+    ws_f = wb_formula[sheet] if wb_formula is not None else None
+    # A stale <dimension> tag would otherwise clip every row read below
+    ws.reset_dimensions()
+    if ws_f is not None:
+        ws_f.reset_dimensions()
+    # Stringified cell values shared by table records and section detection
+    need_text = include_excel_tables or include_inferred_sections
+    # calamine parses the sheet once into lists; openpyxl re-streams the XML on every pass.
+    # Structure-only requests read no values, so the parse would be wasted.
+    cal_rows = None
+    if wb_calamine is not None and structure["calamine_safe"] and (include_cells or need_text):
+        cal_rows = _calamine_rows(wb_calamine, sheet)
+
+    sheet_obj = {}
+    sheet_obj["dims"] = structure["dims"]
+    sheet_obj["frozen_panes"] = structure["frozen_panes"]
+    sheet_obj["merged_ranges"] = structure["merged_ranges"]
+    cells_map = {}
+    text_rows = {}
+
+    # Cells (lineage nodes and the text map are collected in the same pass)
+    lineage_nodes = []
+    if include_cells:
+        value_rows = _value_rows(ws, cal_rows)
+        if need_text:
+            value_rows = _tap_text_map(value_rows, cells_map, text_rows)
+        formula_rows = ws_f.iter_rows(values_only=True) if ws_f is not None else None
+        notes = structure["notes"] if include_comments else None
+        cells = _extract_cells(value_rows, formula_rows, notes, lineage_nodes)
+        sheet_obj["cells"] = cells
+    elif need_text:
+        cells_map, text_rows = _sheet_text_map(_value_rows(ws, cal_rows))
+
+    # Excel ListObjects (tables)
+    excel_tables = []
+    if include_excel_tables:
+        try:
+            for tbl in structure["tables"]:
+                rng = tbl["range"]
+                min_col, min_row, max_col, max_row = range_boundaries(rng)
+                headers = tbl["headers"]
+                records = []
+                for r in range(min_row + 1, max_row + 1):
+                    records.append({
+                        str(headers[c - min_col]): cells_map.get((r, c), "")
+                        for c in range(min_col, max_col + 1)
+                    })
+                excel_tables.append({
+                    "name": tbl["name"],
+                    "range": rng,
+                    "headers": headers,
+                    "records": records
+                })
+        except Exception:
+            pass
+    sheet_obj["tables"] = excel_tables
+
+    # Inferred text sections
+    sections = _detect_text_sections(cells_map, text_rows) if include_inferred_sections else []
+    sheet_obj["sections"] = sections
+
+    # Lineage (formula graph)
+    if include_formulas and include_cells:
+        sheet_obj["lineage"] = {"nodes": lineage_nodes}
+
+    # Chunks (RAG friendly)
+    chunks = _sheet_chunks(sheet, ws, excel_tables, sections, max_cells=chunk_max_cells)
+    sheet_obj["chunks"] = chunks
+
+    return sheet_obj
+
+
+def _close_books(books, mm=None):
+    """Close read-only workbooks (and the mapping behind them)."""
+    for wb in books[:2]:
+        if wb is not None:
+            wb.close()
+    if mm is not None:
+        mm.close()
+
+
+def _process_sheets_in_worker(source, sheets: list, structures: list, options: dict):
+    """Pool task: open the upload (a spooled file path, or raw bytes), process a run of
+    sheets and close the workbooks again, so nothing outlives the task in the worker."""
+    need_formulas = options["include_formulas"] and options["include_cells"]
+    mm = _map_file(source) if isinstance(source, str) else None
+    data = source if mm is None else mm
+    wb_values = wb_formula = None
+    try:
+        wb_values, wb_formula = _open_workbooks(data, need_formulas=need_formulas)
+        wb_calamine = _open_calamine(data) if _use_calamine(options) else None
+        books = (wb_values, wb_formula, wb_calamine)
+        return [_process_sheet(books, sheet, structure, **options) for sheet, structure in zip(sheets, structures)]
+    finally:
+        _close_books((wb_values, wb_formula), mm)
+
+
+def iter_extract_excel_ai(
+    file_bytes: Optional[bytes] = None,
     include_formulas: bool = True,
     include_cells: bool = True,
     include_comments: bool = True,
@@ -244,120 +875,281 @@ def extract_excel_ai(
     include_excel_tables: bool = True,
     include_inferred_sections: bool = True,
     chunk_max_cells: int = 400,
-    file_name: str = "workbook"
+    file_name: str = "workbook",
+    file_path: Optional[str] = None
 ):
-    wb_values, wb_formula = _open_workbooks(file_bytes)
-
-    # Workbook meta
-    meta = {
-        "title": file_name,
-        "sheets": wb_values.sheetnames,
-        "created": _safe_val(getattr(wb_values.properties, "created", None)),
-        "modified": _safe_val(getattr(wb_values.properties, "modified", None))
-    }
+    """Yield ("workbook", meta), ("named_ranges", ranges) and one ("sheet", name, obj) per sheet.
+
+    The workbook is given either as ``file_bytes`` or as ``file_path`` of a spooled
+    upload, which is memory-mapped rather than read into memory.
+    """
+    mm = _map_file(file_path) if file_path is not None else None
+    data = file_bytes if mm is None else mm
+    wb_values = wb_formula = None
+    futures = []
+    try:
+        options = {
+            "include_formulas": include_formulas,
+            "include_cells": include_cells,
+            "include_comments": include_comments,
+            "include_excel_tables": include_excel_tables,
+            "include_inferred_sections": include_inferred_sections,
+            "chunk_max_cells": chunk_max_cells,
+        }
+        wb_values, wb_formula = _open_workbooks(data, need_formulas=include_formulas and include_cells)
+        structure = _scan_structure(
+            data,
+            include_tables=include_excel_tables,
+            check_calamine=_use_calamine(options),
+        )
 
-    out = {"workbook": meta, "sheets": {}}
-
-    # Named ranges
-    if include_named_ranges:
-        out["named_ranges"] = _extract_named_ranges(wb_values)
-
-    # Per sheet
-    for sheet in wb_values.sheetnames:
-        ws = wb_values[sheet]
-        ws_f = wb_formula[sheet]
-
-        sheet_obj = {}
-        sheet_obj["dims"] = ws.calculate_dimension()
-        sheet_obj["frozen_panes"] = getattr(ws, "freeze_panes", None)
-        sheet_obj["merged_ranges"] = [str(rng) for rng in ws.merged_cells.ranges]
-
-        # Cells
-        if include_cells:
-            cells = {}
-            for c in _iter_non_empty(ws):
-                addr = c.coordinate
-                val = _safe_val(c.value)
-                t = _cell_type(c.value)
-                item = {"v": val, "t": t, "display": str(c.value) if c.value is not None else ""}
-                if include_formulas:
-                    c_f = ws_f[addr]
-                    fv = c_f.value if (isinstance(c_f.value, str) and str(c_f.value).startswith("=")) else None
-                    if fv:
-                        item["f"] = fv
-                        item["deps"] = _formula_deps(fv)
-                if include_comments:
-                    item["hyperlink"] = c.hyperlink.target if c.hyperlink else None
-                    item["comment"] = c.comment.text if c.comment else None
-                cells[addr] = item
-            sheet_obj["cells"] = cells
-
-        # Excel ListObjects (tables)
-        excel_tables = []
-        if include_excel_tables and getattr(ws, "tables", None):
+        # Workbook meta
+        meta = {
+            "title": file_name,
+            "sheets": wb_values.sheetnames,
+            "created": _safe_val(getattr(wb_values.properties, "created", None)),
+            "modified": _safe_val(getattr(wb_values.properties, "modified", None))
+        }
+        sheetnames = wb_values.sheetnames
+        yield ("workbook", meta)
+
+        # Named ranges
+        if include_named_ranges:
+            yield ("named_ranges", _extract_named_ranges(wb_values))
+
+        # Sheets are independent, so large multi-sheet workbooks fan out to the pool
+        done = 0
+        if _sheet_pool is not None and len(sheetnames) > 1 and len(data) >= _PARALLEL_MIN_BYTES:
+            # Workers map the spooled file themselves instead of receiving the bytes
+            source = file_path if file_path is not None else file_bytes
+            # One contiguous run of sheets per worker: each opens the upload once, and runs
+            # complete in sheet order
+            size = -(-len(sheetnames) // min(len(sheetnames), _sheet_pool_size))
+            batches = [sheetnames[i:i + size] for i in range(0, len(sheetnames), size)]
             try:
-                from openpyxl.utils.cell import range_boundaries
-                for name, tbl in ws.tables.items():
-                    rng = tbl.ref
-                    min_col, min_row, max_col, max_row = range_boundaries(rng)
-                    headers = []
-                    for c in ws.iter_cols(min_col=min_col, max_col=max_col, min_row=min_row, max_row=min_row):
-                        headers.append(str(c[0].value) if c and c[0].value is not None else "")
-                    records = []
-                    try:
-                        df_sheet = pd.read_excel(io.BytesIO(file_bytes), sheet_name=sheet, header=min_row - 1)
-                        table_height = max_row - min_row
-                        table_width = max_col - min_col + 1
-                        df_tbl = df_sheet.iloc[0:table_height, 0:table_width].copy()
-                        df_tbl.columns = [str(h) for h in headers]
-                        df_tbl = df_tbl.fillna("")
-                        records = df_tbl.astype(object).astype(str).to_dict(orient="records")
-                    except Exception:
-                        records = []
-                    excel_tables.append({
-                        "name": getattr(tbl, "displayName", None) or name,
-                        "range": rng,
-                        "headers": headers,
-                        "records": records
-                    })
-            except Exception:
+                futures = [
+                    _sheet_pool.submit(
+                        _process_sheets_in_worker, source, batch, [structure[s] for s in batch], options
+                    )
+                    for batch in batches
+                ]
+                for batch, fut in zip(batches, futures):
+                    for sheet, sheet_obj in zip(batch, fut.result()):
+                        yield ("sheet", sheet, sheet_obj)
+                        done += 1
+            except (BrokenProcessPool, RuntimeError):
+                # Pool unavailable (shut down or a worker died): finish in-process
                 pass
-        sheet_obj["tables"] = excel_tables
-
-        # Inferred text sections
-        sections = _detect_text_sections(ws) if include_inferred_sections else []
-        sheet_obj["sections"] = sections
 
-        # Lineage (formula graph)
-        if include_formulas and include_cells:
-            lineage_nodes = []
-            for addr, item in sheet_obj.get("cells", {}).items():
-                if "f" in item and item["f"]:
-                    lineage_nodes.append({"cell": addr, "formula": item["f"], "deps": item.get("deps", [])})
-            sheet_obj["lineage"] = {"nodes": lineage_nodes}
+        books = None
+        for sheet in sheetnames[done:]:
+            if books is None:
+                wb_calamine = _open_calamine(data) if _use_calamine(options) else None
+                books = (wb_values, wb_formula, wb_calamine)
+            yield ("sheet", sheet, _process_sheet(books, sheet, structure[sheet], **options))
+    finally:
+        for fut in futures:
+            fut.cancel()
+        _close_books((wb_values, wb_formula), mm)
 
-        # Chunks (RAG friendly)
-        chunks = _sheet_chunks(sheet, ws, excel_tables, sections, max_cells=chunk_max_cells)
-        sheet_obj["chunks"] = chunks
-
-        out["sheets"][sheet] = sheet_obj
 
+def extract_excel_ai(
+    file_bytes: Optional[bytes] = None,
+    include_formulas: bool = True,
+    include_cells: bool = True,
+    include_comments: bool = True,
+    include_named_ranges: bool = True,
+    include_excel_tables: bool = True,
+    include_inferred_sections: bool = True,
+    chunk_max_cells: int = 400,
+    file_name: str = "workbook",
+    file_path: Optional[str] = None
+):
+    out = {"workbook": None, "sheets": {}}
+    for part in iter_extract_excel_ai(
+        file_bytes,
+        include_formulas=include_formulas,
+        include_cells=include_cells,
+        include_comments=include_comments,
+        include_named_ranges=include_named_ranges,
+        include_excel_tables=include_excel_tables,
+        include_inferred_sections=include_inferred_sections,
+        chunk_max_cells=chunk_max_cells,
+        file_name=file_name,
+        file_path=file_path
+    ):
+        if part[0] == "sheet":
+            out["sheets"][part[1]] = part[2]
+        else:
+            out[part[0]] = part[1]
     return out
 
 
-def generate_ndjson_chunks(data: dict) -> str:
-    """Generate NDJSON string from chunks."""
-    lines = []
+def _ndjson_line(ch) -> bytes:
+    """Serialize one chunk as an NDJSON record (without the newline)."""
+    return orjson.dumps({
+        "chunk_id": ch["chunk_id"],
+        "sheet": ch["sheet"],
+        "range": ch["range"],
+        "kind": ch["kind"],
+        "text": ch["text"]
+    })
+
+
+def _sheet_ndjson(sobj) -> bytes:
+    """Newline-terminated NDJSON records for one sheet's chunks."""
+    buf = bytearray()
+    for ch in sobj.get("chunks", []):
+        buf += _ndjson_line(ch)
+        buf += b"\n"
+    return bytes(buf)
+
+
+def iter_ndjson_chunks(parts):
+    """Yield NDJSON bytes, one block per sheet, from ``iter_extract_excel_ai`` parts."""
+    for part in parts:
+        if part[0] == "sheet":
+            block = _sheet_ndjson(part[2])
+            if block:
+                yield block
+
+
+def _reindent(obj, level: int) -> bytes:
+    """orjson's 2-space pretty output shifted right by ``level`` levels."""
+    return orjson.dumps(
+        obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    ).replace(b"\n", b"\n" + b"  " * level)
+
+
+def iter_json_document(parts):
+    """Stream the pretty-printed JSON document one top-level part / sheet at a time.
+
+    Output matches ``orjson.dumps(extract_excel_ai(...), option=OPT_INDENT_2)``
+    while only one sheet object is alive at a time.
+    """
+    named_ranges = None
+    yield b'{\n  "workbook": '
+    first = True
+    for part in parts:
+        if part[0] == "workbook":
+            yield _reindent(part[1], 1) + b',\n  "sheets": {'
+        elif part[0] == "named_ranges":
+            named_ranges = part[1]
+        else:
+            prefix = b"\n    " if first else b",\n    "
+            first = False
+            yield prefix + orjson.dumps(part[1]) + b": " + _reindent(part[2], 2)
+    tail = b"}" if first else b"\n  }"
+    if named_ranges is not None:
+        tail += b',\n  "named_ranges": ' + _reindent(named_ranges, 1)
+    yield tail + b"\n}"
+
+
+def generate_ndjson_chunks(data: dict) -> bytes:
+    """Generate NDJSON bytes from chunks."""
+    buf = bytearray()
     for sname, sobj in data.get("sheets", {}).items():
         for ch in sobj.get("chunks", []):
-            lines.append(json.dumps({
-                "chunk_id": ch["chunk_id"],
-                "sheet": ch["sheet"],
-                "range": ch["range"],
-                "kind": ch["kind"],
-                "text": ch["text"]
-            }, ensure_ascii=False))
-    return "\n".join(lines)
+            if buf:
+                buf += b"\n"
+            buf += _ndjson_line(ch)
+    return bytes(buf)
+
+
+def _unlink_after(body, path):
+    """Pass ``body`` through, then delete the spooled upload at ``path``."""
+    try:
+        yield from body
+    finally:
+        os.unlink(path)
+
+
+# Rendered bodies of recent conversions by ((content hash, file name, options), artifact),
+# bounded by their total size; a preview followed by a download parses once
+_RESULT_CACHE = TTLCache(maxsize=64 << 20, ttl=600, getsizeof=len)
+_RESULT_CACHE_LOCK = threading.Lock()
+# Larger bodies are served without being kept, so streaming them never buffers the whole body
+_CACHE_MAX_BODY = 8 << 20
+
+
+def _cache_get(key, name: str) -> Optional[bytes]:
+    """Cached ``name`` body ("convert", "json" or "ndjson") for ``key``, if any."""
+    with _RESULT_CACHE_LOCK:
+        return _RESULT_CACHE.get((key, name))
+
+
+def _cache_put(key, name: str, body: bytes) -> None:
+    """Keep ``body`` unless it is too large to be worth caching."""
+    if len(body) <= _CACHE_MAX_BODY:
+        with _RESULT_CACHE_LOCK:
+            _RESULT_CACHE[(key, name)] = body
+
+
+def _cache_into(key, name: str, body):
+    """Pass ``body`` through, caching the joined bytes once it completes.
+
+    Collection stops as soon as the body outgrows ``_CACHE_MAX_BODY``.
+    """
+    chunks = []
+    size = 0
+    for chunk in body:
+        if chunks is not None:
+            size += len(chunk)
+            if size > _CACHE_MAX_BODY:
+                chunks = None
+            else:
+                chunks.append(chunk)
+        yield chunk
+    if chunks is not None:
+        _cache_put(key, name, b"".join(chunks))
+
+
+def _cached_data(key) -> Optional[dict]:
+    """Extracted dict recovered from a cached JSON body for ``key``, if any."""
+    for name in ("convert", "json"):
+        body = _cache_get(key, name)
+        if body is not None:
+            data = orjson.loads(body)
+            data.pop("ndjson_chunks", None)
+            return data
+    return None
+
+
+def _parts_from_data(data: dict):
+    """Replay an extracted dict as ``iter_extract_excel_ai`` parts."""
+    yield ("workbook", data["workbook"])
+    if "named_ranges" in data:
+        yield ("named_ranges", data["named_ranges"])
+    for sheet, sheet_obj in data["sheets"].items():
+        yield ("sheet", sheet, sheet_obj)
+
+
+def _convert_body(key, file_path: str, file_name: str, options: dict) -> bytes:
+    """/convert response body for ``key``, from the cache or a fresh extraction."""
+    body = _cache_get(key, "convert")
+    if body is None:
+        data = _cached_data(key)
+        if data is None:
+            data = extract_excel_ai(file_path=file_path, file_name=file_name, **options)
+
+        # Add NDJSON chunks to response
+        ndjson_chunks = generate_ndjson_chunks(data)
+        body = JSONResponse(
+            content={**data, "ndjson_chunks": ndjson_chunks.decode()}
+        ).body
+        _cache_put(key, "convert", body)
+    return body
+
+
+def _cached_body(key, name: str, serialize) -> Optional[bytes]:
+    """Cached ``name`` body for ``key``, rendered from a cached JSON body if needed."""
+    body = _cache_get(key, name)
+    if body is None:
+        data = _cached_data(key)
+        if data is not None:
+            body = b"".join(serialize(_parts_from_data(data)))
+            _cache_put(key, name, body)
+    return body
 
 
 # ---------------- API Routes ----------------
@@ -397,10 +1189,10 @@ async def convert_excel(
     if not file.filename.endswith(('.xlsx', '.xlsm')):
         raise HTTPException(status_code=400, detail="Only .xlsx and .xlsm files are supported")
 
+    tmp_path = None
     try:
-        content = await file.read()
-        data = extract_excel_ai(
-            file_bytes=content,
+        tmp_path, digest = await run_in_threadpool(_spool_upload, file.file)
+        options = dict(
             include_formulas=include_formulas,
             include_cells=include_cells,
             include_comments=include_comments,
@@ -408,16 +1200,18 @@ async def convert_excel(
             include_excel_tables=include_excel_tables,
             include_inferred_sections=include_inferred_sections,
             chunk_max_cells=chunk_max_cells,
-            file_name=file.filename
         )
-        
-        # Add NDJSON chunks to response
-        ndjson_chunks = generate_ndjson_chunks(data)
-        data["ndjson_chunks"] = ndjson_chunks
-        
-        return JSONResponse(content=data)
+        key = (digest, file.filename, *options.values())
+        # Extraction is CPU-bound; keep it off the event loop so other requests are served
+        body = await run_in_threadpool(_convert_body, key, tmp_path, file.filename, options)
+        return Response(content=body, media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if tmp_path is not None:
+            os.unlink(tmp_path)
 
 
 @app.post("/convert/download")
@@ -436,10 +1230,10 @@ async def convert_and_download(
     if not file.filename.endswith(('.xlsx', '.xlsm')):
         raise HTTPException(status_code=400, detail="Only .xlsx and .xlsm files are supported")
 
+    tmp_path = None
     try:
-        content = await file.read()
-        data = extract_excel_ai(
-            file_bytes=content,
+        tmp_path, digest = await run_in_threadpool(_spool_upload, file.file)
+        options = dict(
             include_formulas=include_formulas,
             include_cells=include_cells,
             include_comments=include_comments,
@@ -447,30 +1241,53 @@ async def convert_and_download(
             include_excel_tables=include_excel_tables,
             include_inferred_sections=include_inferred_sections,
             chunk_max_cells=chunk_max_cells,
-            file_name=file.filename
         )
+        key = (digest, file.filename, *options.values())
         
         base_name = os.path.splitext(file.filename)[0]
         
         if format == "ndjson":
-            ndjson_content = generate_ndjson_chunks(data)
-            return StreamingResponse(
-                io.BytesIO(ndjson_content.encode()),
-                media_type="application/x-ndjson",
-                headers={"Content-Disposition": f"attachment; filename={base_name}_chunks.ndjson"}
-            )
+            name, serialize = "ndjson", iter_ndjson_chunks
+            media_type = "application/x-ndjson"
+            filename = f"{base_name}_chunks.ndjson"
         else:
-            json_content = json.dumps(data, indent=2, ensure_ascii=False, default=str)
-            return StreamingResponse(
-                io.BytesIO(json_content.encode()),
-                media_type="application/json",
-                headers={"Content-Disposition": f"attachment; filename={base_name}_output.json"}
-            )
+            name, serialize = "json", iter_json_document
+            media_type = "application/json"
+            filename = f"{base_name}_output.json"
+        headers = {"Content-Disposition": f"attachment; filename={filename}"}
+
+        body = await run_in_threadpool(_cached_body, key, name, serialize)
+        if body is not None:
+            os.unlink(tmp_path)
+            tmp_path = None
+            return Response(content=body, media_type=media_type, headers=headers)
+
+        parts = iter_extract_excel_ai(file_path=tmp_path, file_name=file.filename, **options)
+        # Open the workbook before the response starts so bad files still get a 500
+        parts = chain([await run_in_threadpool(next, parts)], parts)
+        # The spooled file must outlive the endpoint: it is removed once the body is done
+        return StreamingResponse(
+            _unlink_after(_cache_into(key, name, serialize(parts)), tmp_path),
+            media_type=media_type,
+            headers=headers
+        )
+    except HTTPException:
+        raise
     except Exception as e:
+        if tmp_path is not None:
+            os.unlink(tmp_path)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One server process by default: the result cache is per process, so a preview and its
+    # download landing on different workers would parse twice, and the sheet pool gets every core.
+    # Set WEB_CONCURRENCY to trade that for more parallel requests.
+    workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+    # Exported so each worker's lifespan sizes its sheet pool to its share of the cores
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    # Multiple workers need the app as an import string; loop/http stay "auto", which picks
+    # uvloop and httptools wherever uvicorn[standard] installs them (not on Windows)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers)
 
@@ -0,0 +1,82 @@
+import io
+
+import pytest
+from openpyxl import Workbook
+
+import main
+
+pytest.importorskip("python_calamine")
+
+
+def _xlsx(fill):
+    wb = Workbook()
+    fill(wb.active)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _cells(data, monkeypatch, calamine):
+    if not calamine:
+        monkeypatch.setattr(main, "CalamineWorkbook", None)
+    out = main.extract_excel_ai(data, include_formulas=False, include_named_ranges=False)
+    return out["sheets"]["Sheet"]["cells"]
+
+
+def _both_paths(data, monkeypatch):
+    with_calamine = _cells(data, monkeypatch, calamine=True)
+    without = _cells(data, monkeypatch, calamine=False)
+    assert with_calamine == without
+    return with_calamine
+
+
+def test_error_cells_keep_their_code(monkeypatch):
+    def fill(ws):
+        ws["A1"] = "#N/A"
+        ws["A2"] = "#DIV/0!"
+        ws["A3"] = 1
+
+    cells = _both_paths(_xlsx(fill), monkeypatch)
+    assert cells["A1"]["v"] == "#N/A"
+    assert cells["A2"]["v"] == "#DIV/0!"
+
+
+def test_whitespace_only_strings_are_kept(monkeypatch):
+    def fill(ws):
+        ws["A1"] = "   "
+        ws["A2"] = " padded "
+        ws["A3"] = "text"
+
+    cells = _both_paths(_xlsx(fill), monkeypatch)
+    assert cells["A1"]["v"] == "   "
+    assert cells["A2"]["v"] == " padded "
+
+
+def test_integral_floats_stay_floats(monkeypatch):
+    def fill(ws):
+        ws["A1"] = 1e20
+        ws["A2"] = 7
+
+    cells = _both_paths(_xlsx(fill), monkeypatch)
+    assert type(cells["A1"]["v"]) is float
+    assert type(cells["A2"]["v"]) is int
+
+
+def test_duration_formats_read_as_time(monkeypatch):
+    def fill(ws):
+        ws["A1"] = 0.25
+        ws["A1"].number_format = "[h]:mm:ss"
+        ws["A2"] = "label"
+
+    cells = _both_paths(_xlsx(fill), monkeypatch)
+    assert cells["A1"]["display"] == "06:00:00"
+
+
+def test_plain_sheets_still_use_calamine(monkeypatch):
+    def fill(ws):
+        ws.append(["name", 1, 2.5])
+
+    data = _xlsx(fill)
+    structure = main._scan_structure(data, check_calamine=True)
+    assert structure["Sheet"]["calamine_safe"]
+    _both_paths(data, monkeypatch)